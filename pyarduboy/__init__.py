@@ -40,9 +40,10 @@ def _patch_dataclasses_for_libretro():
     original = dataclasses._process_class  # type: ignore[attr-defined]
 
     def patched_process_class(cls, *args, **kwargs):
-        module_name = getattr(cls, "__module__", "")
-        if not getattr(cls, "__doc__", None) and module_name.startswith("libretro."):
-            cls.__doc__ = f"{cls.__name__} structure"
+        # 进程内所有 dataclass 都会经过这里：类对象必然有 __doc__ / __module__,
+        # 直接读取属性;绝大多数类带有文档字符串,第一个判断即可返回
+        if not cls.__doc__ and cls.__module__[:9] == "libretro.":
+            cls.__doc__ = cls.__name__ + " structure"
         return original(cls, *args, **kwargs)
 
     dataclasses._process_class = patched_process_class  # type: ignore[assignment]
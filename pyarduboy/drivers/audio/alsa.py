@@ -1,9 +1,10 @@
 """
-ALSA 音频驱动（直通模式）
+ALSA 音频驱动（直通 / 自动增益 / 24-bit 输出）
 """
 import numpy as np
 from typing import Optional
 from .base import AudioDriver
+from ._kernels import aligned_empty, aligned_zeros, apply_gain_q15, float_to_int16, pack_s24le
 
 try:
     import alsaaudio
@@ -13,14 +14,23 @@ except ImportError:
 
 
 class AlsaAudioDriver(AudioDriver):
-    """使用 ALSA 直接播放 libretro 输出的 int16 音频，不做额外处理。"""
+    """
+    使用 ALSA 播放 libretro 输出的 int16 音频
+
+    处理模式由构造参数组合决定，init() 时选定对应的处理函数：
+        - auto_gain=False：直通模式，不做任何处理
+        - auto_gain=True：检测前几帧峰值，峰值偏高时自动衰减到标准音量
+        - use_24bit=True：以 S24_3LE 格式输出
+    """
 
     def __init__(
         self,
         device: str = 'default',
         sample_rate: Optional[int] = None,
         channels: int = 2,
-        buffer_size: int = 256
+        buffer_size: int = 256,
+        use_24bit: bool = False,
+        auto_gain: bool = True
     ):
         if not ALSA_AVAILABLE:
             raise ImportError(
@@ -34,17 +44,35 @@ class AlsaAudioDriver(AudioDriver):
         self._sample_rate = sample_rate or 0
         self.channels = channels
         self.buffer_size = buffer_size
+        self.use_24bit = use_24bit
         self.pcm: Optional[alsaaudio.PCM] = None
         self._running = False
         self._write_errors = 0
 
+        # 输出缓冲区（跨帧复用，按需扩容）
+        # 初始容量按最坏情况估算：8192 采样 × 立体声 × 3 字节
+        self._out_buf = aligned_empty(8192 * 6, np.uint8)
+
+        # 暂存缓冲区：按设备声道布局积累采样，凑满整周期再写入 ALSA，
+        # 减少小帧时的写入调用次数；容量为 4 个周期，_stage_n 为已暂存的帧数
+        self._stage = aligned_zeros((self.buffer_size * 4, self.channels), np.int16)
+        self._stage_n = 0
+        self._write_frames = self._write_s16le  # init() 时按输出格式重新选定
+
         # 音频增益自动校正（解决多线程环境下增益不一致的问题）
-        self._auto_gain = True
+        # _gain_stage 为当前的增益处理函数：检测阶段 → 应用增益 / 直通（None）
+        self._auto_gain = auto_gain
+        self._gain_stage = self._probe_gain if auto_gain else None
         self._target_peak = 2000  # Ardens 标准音量峰值
         self._detected_peak = None
+        self._gain_q15: Optional[int] = None  # Q15 定点增益系数，检测到峰值后计算一次
+        self._gain_probe_count = 0  # 已用于峰值检测的非零帧数
+        self._gain_probe_frames = 10  # 只在前 10 帧非零音频中检测峰值
 
         # 调试开关
         self._debug = False  # 设置为 True 启用详细调试信息
+        self._frame_count = 0
+        self._non_zero_count = 0
 
     def init(self, sample_rate: int = 44100) -> bool:
         """
@@ -75,8 +103,8 @@ class AlsaAudioDriver(AudioDriver):
             )
 
             # 选择音频格式
-            audio_format = alsaaudio.PCM_FORMAT_S16_LE
-            bit_depth = 16
+            audio_format = alsaaudio.PCM_FORMAT_S24_3LE if self.use_24bit else alsaaudio.PCM_FORMAT_S16_LE
+            bit_depth = 24 if self.use_24bit else 16
 
             # 配置音频参数
             self.pcm.setchannels(self.channels)
@@ -84,6 +112,9 @@ class AlsaAudioDriver(AudioDriver):
             self.pcm.setformat(audio_format)  # 24-bit 或 16-bit signed little-endian
             self.pcm.setperiodsize(self.buffer_size)
 
+            # 按输出格式选定写出函数，热路径上不再判断位深
+            self._write_frames = self._write_s24le if self.use_24bit else self._write_s16le
+
             self._running = True
 
             print(f"ALSA Audio initialized:")
@@ -128,12 +159,8 @@ class AlsaAudioDriver(AudioDriver):
         try:
             # 调试信息：监控音频数据
             if self._debug:
-                if not hasattr(self, '_frame_count'):
-                    self._frame_count = 0
-                    self._non_zero_count = 0
-
                 self._frame_count += 1
-                max_val = abs(samples).max()
+                max_val = np.abs(samples).max()
 
                 # 检测到非零音频时打印
                 if max_val > 0:
@@ -149,49 +176,28 @@ class AlsaAudioDriver(AudioDriver):
                 # 每1000帧统计一次
                 if self._frame_count % 1000 == 0:
                     print(f"[ALSA Stats] {self._frame_count} frames, {self._non_zero_count} non-zero ({100*self._non_zero_count/self._frame_count:.1f}%)")
-            else:
-                # 即使不调试，也需要计算 max_val 用于增益控制
-                max_val = abs(samples).max()
 
             # 转换为 int16
-            if samples.dtype != np.int16:
-                samples_int16 = np.asarray(samples, dtype=np.int16)
-            else:
+            if samples.dtype == np.int16:
                 samples_int16 = samples
+            elif samples.dtype.kind == 'f':
+                # 浮点输入范围为 [-1.0, 1.0]，需要缩放后再转换
+                samples_int16 = float_to_int16(samples)
+            else:
+                samples_int16 = np.asarray(samples, dtype=np.int16)
 
             # 自动增益校正
-            if self._auto_gain and max_val > 0:
-                # 检测峰值（使用前几帧非零音频的最大值）
-                if self._detected_peak is None:
-                    # 初始化非零计数器（如果未开启调试模式）
-                    if not hasattr(self, '_non_zero_count'):
-                        self._non_zero_count = 0
-                    self._non_zero_count += 1
-
-                    if self._non_zero_count <= 10:
-                        current_peak = abs(samples_int16).max()
-                        if current_peak > self._target_peak * 1.5:  # 峰值明显高于标准值
-                            self._detected_peak = current_peak
-                            print(f"[ALSA] Auto-gain detected peak: {current_peak}, target: {self._target_peak}")
-                            print(f"[ALSA] Gain correction factor: {self._target_peak / current_peak:.3f}")
+            if self._gain_stage is not None:
+                samples_int16 = self._gain_stage(samples_int16)
 
-                # 应用增益校正
-                if self._detected_peak and self._detected_peak > self._target_peak:
-                    gain_factor = self._target_peak / self._detected_peak
-                    samples_int16 = (samples_int16.astype(np.float32) * gain_factor).astype(np.int16)
-
-            if not samples_int16.flags['C_CONTIGUOUS']:
-                samples_int16 = np.ascontiguousarray(samples_int16)
-
-            audio_data = samples_int16.tobytes()
+            # 整理为 (帧数, 声道数) 的视图；(n, 1) 形状的单声道输入在立体声设备上
+            # 保持单列，写入暂存缓冲区时通过广播展开为双声道
+            if samples_int16.ndim == 2 and samples_int16.shape[1] == 1 and self.channels == 2:
+                frames = samples_int16
+            else:
+                frames = samples_int16.reshape(-1, self.channels)
 
-            try:
-                self.pcm.write(audio_data)
-            except alsaaudio.ALSAAudioError as e:
-                # 非阻塞模式下，缓冲区满时会抛出异常，这是正常的
-                self._write_errors += 1
-                if self._write_errors % 100 == 1:  # 每100次丢帧警告一次
-                    print(f"[ALSA] Buffer full, dropped {self._write_errors} frames: {e}")
+            self._stage_frames(frames)
 
             # 更新统计信息
         except Exception as e:
@@ -202,9 +208,92 @@ class AlsaAudioDriver(AudioDriver):
                 traceback.print_exc()
                 self._error_printed = True
 
+    def _probe_gain(self, samples: np.ndarray) -> np.ndarray:
+        """
+        自动增益检测阶段：使用前几帧非零音频的最大值检测峰值
+
+        检测到偏高的峰值后切换为 _apply_gain；检测结束仍未发现偏高峰值时
+        切换为直通，此后不再扫描缓冲区
+        """
+        current_peak = int(np.abs(samples).max())
+        if current_peak > 0:
+            self._gain_probe_count += 1
+            if current_peak > self._target_peak * 1.5:  # 峰值明显高于标准值
+                self._detected_peak = current_peak
+                self._gain_q15 = int(round(self._target_peak / current_peak * 32768))
+                self._gain_stage = self._apply_gain
+                print(f"[ALSA] Auto-gain detected peak: {current_peak}, target: {self._target_peak}")
+                print(f"[ALSA] Gain correction factor: {self._target_peak / current_peak:.3f}")
+                return self._apply_gain(samples)
+
+            if self._gain_probe_count >= self._gain_probe_frames:
+                self._gain_stage = None
+        return samples
+
+    def _apply_gain(self, samples: np.ndarray) -> np.ndarray:
+        """应用增益校正（整数定点乘法，不经过 float32 往返）"""
+        return apply_gain_q15(samples, self._gain_q15)
+
+    def _stage_frames(self, frames: np.ndarray) -> None:
+        """
+        将音频帧复制到暂存缓冲区，每凑满整周期就批量写入 ALSA
+
+        Args:
+            frames: (帧数, 声道数) 的 int16 数组，声道数为 1 时广播到所有声道
+        """
+        stage = self._stage
+        period = self.buffer_size
+        pos = 0
+        total = frames.shape[0]
+
+        while pos < total:
+            take = min(total - pos, stage.shape[0] - self._stage_n)
+            stage[self._stage_n:self._stage_n + take] = frames[pos:pos + take]
+            self._stage_n += take
+            pos += take
+
+            if self._stage_n >= period:
+                # 一次写入所有完整周期，剩余不足一个周期的数据移到开头
+                ready = self._stage_n - self._stage_n % period
+                self._write_frames(stage[:ready])
+                rest = self._stage_n - ready
+                stage[:rest] = stage[ready:self._stage_n]
+                self._stage_n = rest
+
+    def _write_s16le(self, frames: np.ndarray) -> None:
+        """以 S16_LE 格式写出连续的 int16 音频帧"""
+        # 直接以字节视图写出，省去 tobytes() 的整块复制
+        self._pcm_write(memoryview(frames).cast('B'))
+
+    def _write_s24le(self, frames: np.ndarray) -> None:
+        """将连续的 int16 音频帧打包为 S24_3LE 格式后写出"""
+        packed = pack_s24le(frames, self._get_out_buf(frames.size * 3))
+        self._pcm_write(memoryview(packed))
+
+    def _pcm_write(self, audio_data) -> None:
+        """写入 ALSA PCM，非阻塞模式下缓冲区满时丢弃数据"""
+        try:
+            self.pcm.write(audio_data)
+        except alsaaudio.ALSAAudioError as e:
+            # 非阻塞模式下，缓冲区满时会抛出异常，这是正常的
+            self._write_errors += 1
+            if self._write_errors % 100 == 1:  # 每100次丢帧警告一次
+                print(f"[ALSA] Buffer full, dropped {self._write_errors} frames: {e}")
+
+    def _get_out_buf(self, nbytes: int) -> np.ndarray:
+        """
+        获取容量至少为 nbytes 的输出缓冲区
+
+        容量不足时按 2 倍扩容，避免在热路径上反复分配
+        """
+        if nbytes > self._out_buf.nbytes:
+            self._out_buf = aligned_empty(nbytes * 2, np.uint8)
+        return self._out_buf
+
     def close(self) -> None:
         """关闭 ALSA 音频设备"""
         self._running = False
+        self._stage_n = 0
 
         if self.pcm:
             try:
@@ -5,9 +5,9 @@ PyAudio 音频驱动
 """
 import numpy as np
 import threading
-from collections import deque
 from typing import Optional
 from .base import AudioDriver
+from ._kernels import aligned_zeros, float_to_int16, pack_s24le
 
 try:
     import pyaudio
@@ -45,9 +45,15 @@ class PyAudioDriver(AudioDriver):
         self._stream: Optional[pyaudio.Stream] = None
         self._running = False
 
-        # 音频缓冲队列（线程安全）
-        self._audio_buffer = deque()
+        # 音频环形缓冲区（int16 交错采样，init() 时按采样率分配）
+        # 读写位置为单调递增的采样计数，取模得到下标；生产者写入数据时不持有锁
+        self._ring: Optional[np.ndarray] = None
+        self._read_pos = 0
+        self._write_pos = 0
         self._buffer_lock = threading.Lock()
+        self._cb_buf = aligned_zeros(0, np.int16)
+        self._bytes_per_sample = 3 if use_24bit else 2
+        self._silence = b''
 
         # 音频统计信息（用于调试）
         self._frame_count = 0
@@ -67,35 +73,49 @@ class PyAudioDriver(AudioDriver):
         Returns:
             (audio_data, paContinue)
         """
-        # 计算需要的字节数：24-bit = 3 bytes, 16-bit = 2 bytes
-        bytes_per_sample = 3 if self.use_24bit else 2
-        needed_bytes = frame_count * self.channels * bytes_per_sample
-
-        with self._buffer_lock:
-            if self._audio_buffer:
-                # 从队列中取出数据
-                audio_data = bytearray()
-
-                # 尽可能多地从队列中取数据，直到满足 needed_bytes 或队列为空
-                while len(audio_data) < needed_bytes and self._audio_buffer:
-                    chunk = self._audio_buffer.popleft()
-                    audio_data.extend(chunk)
-
-                # 如果数据足够，截取需要的部分
-                if len(audio_data) >= needed_bytes:
-                    result = bytes(audio_data[:needed_bytes])
-                    # 如果有多余的数据，放回队列头部
-                    remaining = audio_data[needed_bytes:]
-                    if remaining:
-                        self._audio_buffer.appendleft(bytes(remaining))
-                else:
-                    # 数据不足，补充静音
-                    result = bytes(audio_data) + bytes(needed_bytes - len(audio_data))
-                    self._underrun_count += 1  # 记录缓冲区不足次数
-            else:
-                # 队列为空，播放静音
-                result = bytes(needed_bytes)
-                self._underrun_count += 1  # 记录缓冲区空次数
+        # callback 在实时优先级线程中运行，先把属性读取到局部变量，
+        # 减少函数体内的属性查找
+        ring = self._ring
+        lock = self._buffer_lock
+        out = self._cb_buf
+        needed_samples = frame_count * self.channels
+
+        if needed_samples > out.size:
+            out = self._cb_buf = aligned_zeros(needed_samples, np.int16)
+        out = out[:needed_samples]
+
+        with lock:
+            read_pos = self._read_pos
+            take = min(needed_samples, self._write_pos - read_pos)
+            if take > 0:
+                # 按采样粒度从环形缓冲区复制到 callback 输出缓冲区，
+                # 跨越末尾时分两段复制，不做拼接
+                ring_size = ring.size
+                start = read_pos % ring_size
+                first = min(take, ring_size - start)
+                out[:first] = ring[start:start + first]
+                if first < take:
+                    out[first:take] = ring[:take - first]
+                self._read_pos = read_pos + take
+
+        if take <= 0:
+            # 缓冲区为空，直接返回缓存的静音数据，不再清零、打包和复制
+            self._underrun_count += 1  # 记录缓冲区空次数
+            silence = self._silence
+            needed_bytes = needed_samples * self._bytes_per_sample
+            if len(silence) != needed_bytes:
+                silence = self._silence = bytes(needed_bytes)
+            return (silence, pyaudio.paContinue)
+
+        if take < needed_samples:
+            # 数据不足，补充静音
+            out[take:] = 0
+            self._underrun_count += 1  # 记录缓冲区不足次数
+
+        if self.use_24bit:
+            result = pack_s24le(out).tobytes()
+        else:
+            result = out.tobytes()
 
         return (result, pyaudio.paContinue)
 
@@ -137,6 +157,17 @@ class PyAudioDriver(AudioDriver):
                 stream_callback=self._audio_callback  # 使用 callback 模式
             )
 
+            # 分配环形缓冲区：32 个周期或约 250ms，取较大者，避免延迟累积
+            ring_frames = max(self.buffer_size * 32, self._sample_rate // 4)
+            self._ring = aligned_zeros(ring_frames * self.channels, np.int16)
+            self._read_pos = 0
+            self._write_pos = 0
+            # callback 输出缓冲区（仅 callback 线程使用，跨调用复用）
+            self._cb_buf = aligned_zeros(self.buffer_size * self.channels, np.int16)
+            # 一个周期的静音数据：24-bit = 3 bytes, 16-bit = 2 bytes
+            self._bytes_per_sample = 3 if self.use_24bit else 2
+            self._silence = bytes(self.buffer_size * self.channels * self._bytes_per_sample)
+
             # 启动音频流
             self._stream.start_stream()
             self._running = True
@@ -178,26 +209,41 @@ class PyAudioDriver(AudioDriver):
             return
 
         try:
-            if samples.dtype != np.int16:
-                samples_int16 = np.asarray(samples, dtype=np.int16)
-            else:
+            if samples.dtype == np.int16:
                 samples_int16 = samples
+            elif samples.dtype.kind == 'f':
+                # 浮点输入范围为 [-1.0, 1.0]，需要缩放后再转换
+                samples_int16 = float_to_int16(samples)
+            else:
+                samples_int16 = np.asarray(samples, dtype=np.int16)
 
-            if not samples_int16.flags['C_CONTIGUOUS']:
-                samples_int16 = np.ascontiguousarray(samples_int16)
+            # int16 输入不做任何预处理：reshape 对 1D 数组（包括非连续视图）
+            # 不复制数据，步长由下面写入环形缓冲区的 np.copyto 处理，
+            # 整个生产者路径只有这一次复制
+            src = samples_int16.reshape(-1)
+            ring = self._ring
+            n = src.size
+            if n > ring.size:
+                # 单次数据超过缓冲区容量，只保留最新部分
+                src = src[n - ring.size:]
+                n = ring.size
 
-            audio_data = samples_int16.tobytes()
+            with self._buffer_lock:
+                # 空间不足时丢弃最旧的数据（避免延迟累积）
+                overflow = self._write_pos + n - self._read_pos - ring.size
+                if overflow > 0:
+                    self._read_pos += overflow
+                write_pos = self._write_pos
+
+            # 写入的区域不会被 callback 读取，可以在锁外复制
+            start = write_pos % ring.size
+            first = min(n, ring.size - start)
+            np.copyto(ring[start:start + first], src[:first])
+            if first < n:
+                np.copyto(ring[:n - first], src[first:])
 
             with self._buffer_lock:
-                # 限制缓冲队列大小，避免延迟累积
-                # 保持约 15 帧的数据（约 250ms @ 60 FPS）提供足够缓冲
-                max_buffer_items = 15
-                if len(self._audio_buffer) < max_buffer_items:
-                    self._audio_buffer.append(audio_data)
-                else:
-                    # 队列满了，移除最旧的数据（避免延迟累积）
-                    self._audio_buffer.popleft()
-                    self._audio_buffer.append(audio_data)
+                self._write_pos = write_pos + n
 
             # 更新统计信息
             self._frame_count += 1
@@ -207,7 +253,7 @@ class PyAudioDriver(AudioDriver):
             # if self._frame_count % 300 == 0:
             #     avg_samples = self._total_samples / self._frame_count if self._frame_count > 0 else 0
             #     underrun_rate = self._underrun_count / self._frame_count * 100 if self._frame_count > 0 else 0
-            #     buffer_len = len(self._audio_buffer)
+            #     buffer_len = self._write_pos - self._read_pos
             #     print(f"[PyAudio] Frames: {self._frame_count}, "
             #           f"Avg: {avg_samples:.1f} samples/frame, "
             #           f"Underruns: {self._underrun_count} ({underrun_rate:.1f}%), "
@@ -241,7 +287,8 @@ class PyAudioDriver(AudioDriver):
             self._pyaudio = None
 
         with self._buffer_lock:
-            self._audio_buffer.clear()
+            self._read_pos = 0
+            self._write_pos = 0
 
         print("PyAudio closed")
 
@@ -1,9 +1,13 @@
 """
 Pygame Mixer 音频驱动（直通模式）
 """
+import logging
+import threading
+from collections import deque
 import numpy as np
 from typing import Optional
 from .base import AudioDriver
+from ._kernels import aligned_empty, expand_mono, float_to_int16, warmup
 
 try:
     import pygame.mixer
@@ -12,6 +16,55 @@ try:
 except ImportError:
     PYGAME_AVAILABLE = False
 
+# 默认不输出任何日志，由应用自行配置 logging 决定是否显示
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# 每种帧长度预分配的 Sound 数量（通道最多同时持有播放中 + 排队中两个）
+SOUND_RING_SIZE = 4
+# 最多为几种不同的帧长度预分配 Sound，超出后回退到逐帧创建
+MAX_RING_LENGTHS = 4
+# 每提交多少帧检查一次通道是否意外空闲（queue 在空闲通道上被丢弃时重新启动播放）
+PRIME_CHECK_INTERVAL = 64
+# 等待 feeder 线程提交的最大帧数，队列满时丢弃最旧的一帧以限制延迟
+PENDING_FRAMES = 3
+
+# 未指定 buffer_size / latency_ms 时的目标缓冲延迟（ms），
+# 50000 Hz / 44100 Hz 下均对应 256 帧
+DEFAULT_LATENCY_MS = 10.0
+# 低延迟版本的目标缓冲延迟（ms）
+LOW_LATENCY_MS = 5.0
+# init() 时预先生成转换函数的输入格式：(dtype, 维数, 声道数)
+# 覆盖 libretro 的 int16 输出以及常见的 float32 单声道 / 立体声输入
+PRESET_FORMATS = tuple(
+    (np.dtype(dtype), ndim, in_channels)
+    for dtype in (np.int16, np.float32)
+    for ndim, in_channels in ((1, 1), (2, 1), (2, 2))
+)
+# 缓冲区帧数下限，过小的周期会让 SDL 回调过于频繁
+MIN_BUFFER_SIZE = 64
+
+
+def buffer_size_for_latency(sample_rate: int, latency_ms: float) -> int:
+    """
+    按目标延迟计算 mixer 缓冲区帧数
+
+    取不超过 sample_rate * latency_ms / 1000 的最大 2 的幂（SDL 要求），
+    且不小于 MIN_BUFFER_SIZE。缓冲区越小延迟越低，但 SDL 回调更频繁、
+    CPU 负载更高，系统繁忙时更容易欠载断音；缓冲区越大越稳定，延迟也越高。
+
+    Args:
+        sample_rate: 采样率
+        latency_ms: 目标延迟（毫秒）
+
+    Returns:
+        缓冲区帧数
+    """
+    frames = int(sample_rate * latency_ms / 1000)
+    if frames < MIN_BUFFER_SIZE:
+        return MIN_BUFFER_SIZE
+    return 1 << (frames.bit_length() - 1)
+
 
 class PygameMixerDriver(AudioDriver):
     """使用 pygame.mixer 播放原始 int16 音频，不做音量或重采样处理。"""
@@ -20,8 +73,17 @@ class PygameMixerDriver(AudioDriver):
         self,
         sample_rate: Optional[int] = None,
         channels: int = 2,
-        buffer_size: int = 256
+        buffer_size: Optional[int] = None,
+        latency_ms: Optional[float] = None
     ):
+        """
+        Args:
+            sample_rate: 采样率，None 时使用 init() 传入的采样率
+            channels: 声道数
+            buffer_size: mixer 缓冲区帧数；指定时优先于 latency_ms
+            latency_ms: 目标缓冲延迟（毫秒），init() 时按实际采样率换算为
+                        2 的幂帧数；两者都未指定时使用 DEFAULT_LATENCY_MS
+        """
         super().__init__()
 
         if not PYGAME_AVAILABLE:
@@ -30,10 +92,31 @@ class PygameMixerDriver(AudioDriver):
         self._sample_rate = sample_rate or 0
         self.channels = channels
         self.buffer_size = buffer_size
+        self.latency_ms = latency_ms
 
         self._initialized = False
         self._channel = None
 
+        # 按帧长度缓存的可复用 Sound 环：{帧数: [sounds, 采样视图, 下一个下标]}
+        self._sound_rings = {}
+        # 未缓存帧长度时使用的暂存缓冲区（Sound(buffer=...) 会复制数据，可跨帧复用）
+        self._scratch = aligned_empty(0, np.int16)
+
+        # 针对输入格式特化的声道转换函数表：{(dtype, ndim, 声道数): fn(samples, dst)}
+        # init() 确定 mixer 声道数后按 PRESET_FORMATS 预先生成
+        self._fast_paths = {}
+
+        # 通道是否已通过 play() 启动；启动后只调用 queue() 提交
+        self._primed = False
+        self._submit_count = 0
+
+        # 模拟器线程只把采样放入 _pending，转换和提交由 feeder 线程完成；
+        # feeder 线程独占 Sound 环和通道的 play/queue 调用
+        self._pending = deque(maxlen=PENDING_FRAMES)
+        self._pending_event = threading.Event()
+        self._feeder_thread: Optional[threading.Thread] = None
+        self._error_printed = False
+
     def init(self, sample_rate: int = 50000) -> bool:
         """
         初始化音频驱动
@@ -54,6 +137,11 @@ class PygameMixerDriver(AudioDriver):
         if self._sample_rate <= 0:
             self._sample_rate = 44100
 
+        # 未指定帧数时按目标延迟和实际采样率计算
+        if self.buffer_size is None:
+            latency_ms = self.latency_ms if self.latency_ms is not None else DEFAULT_LATENCY_MS
+            self.buffer_size = buffer_size_for_latency(self._sample_rate, latency_ms)
+
         try:
             # 初始化 pygame.mixer（如果还没初始化）
             if not pygame.mixer.get_init():
@@ -72,25 +160,44 @@ class PygameMixerDriver(AudioDriver):
             self._initialized = True
 
             actual_freq, actual_size, actual_channels = pygame.mixer.get_init()
-            print("Pygame Mixer initialized (pass-through):")
-            print(f"  Requested: {self._sample_rate}Hz, {self.channels} ch, buffer={self.buffer_size}")
-            print(f"  Actual:    {actual_freq}Hz, {actual_channels} ch, {actual_size}-bit")
+            logger.info(
+                "Pygame Mixer initialized (pass-through): requested %dHz, %d ch, buffer=%d; "
+                "actual %dHz, %d ch, %d-bit",
+                self._sample_rate, self.channels, self.buffer_size,
+                actual_freq, actual_channels, actual_size
+            )
 
             # 更新实际的声道数和采样率
             if actual_freq != self._sample_rate:
-                print(f"  Warning: Sample rate mismatch! Using {actual_freq}Hz instead of {self._sample_rate}Hz")
+                logger.warning(
+                    "Sample rate mismatch! Using %dHz instead of %dHz", actual_freq, self._sample_rate
+                )
                 self._sample_rate = actual_freq
 
             if actual_channels != self.channels:
-                print(f"  Warning: Channel count mismatch! Using {actual_channels} channels instead of {self.channels}")
+                logger.warning(
+                    "Channel count mismatch! Using %d channels instead of %d", actual_channels, self.channels
+                )
                 self.channels = actual_channels
 
+            # 声道数确定后生成转换函数表，热路径上只需一次字典查找
+            self._fast_paths = {fmt: self._build_fast_path(*fmt) for fmt in PRESET_FORMATS}
+
+            # 在第一个音频帧之前预热音频内核，避免首帧的 JIT 调用开销造成断音
+            warmup()
+
+            # 声道数确定后再启动 feeder 线程
+            self._pending.clear()
+            self._pending_event.clear()
+            self._feeder_thread = threading.Thread(
+                target=self._feeder, name="PygameMixerFeeder", daemon=True
+            )
+            self._feeder_thread.start()
+
             return True
 
-        except Exception as e:
-            print(f"Failed to initialize Pygame Mixer: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.error("Failed to initialize Pygame Mixer", exc_info=True)
             return False
 
     def play_samples(self, samples: np.ndarray) -> None:
@@ -112,70 +219,187 @@ class PygameMixerDriver(AudioDriver):
         if samples is None or len(samples) == 0:
             return
 
+        # 只做一次入队，不在模拟器线程上转换或调用 SDL；
+        # 队列已满时 deque 自动丢弃最旧的一帧。
+        # libretro_bridge 每帧返回新数组，这里无需复制
+        self._pending.append(samples)
+        self._pending_event.set()
+
+    def _feeder(self) -> None:
+        """feeder 线程主循环：取出待播放的采样并提交到 mixer 通道"""
+        pending = self._pending
+        event = self._pending_event
+
+        while self._initialized:
+            event.wait()
+            # 先清除事件再取数据：取空之后到达的采样会重新置位事件，不会丢失唤醒
+            event.clear()
+            while pending:
+                try:
+                    samples = pending.popleft()
+                except IndexError:
+                    break
+                self._submit(samples)
+
+    def _submit(self, samples: np.ndarray) -> None:
+        """
+        转换一帧采样并提交到 mixer 通道（仅在 feeder 线程中调用）
+
+        Args:
+            samples: 音频采样数据，格式同 play_samples
+        """
         try:
-            # 1. 处理不同的输入格式并归一化
-            # 参考 Ardens: SOUND_GAIN=2000, 归一化时除以 32768
-            if samples.dtype != np.int16:
-                samples_int16 = np.asarray(samples, dtype=np.int16)
+            # 1. 按输入格式查表选择特化的转换函数，预设之外的格式首次出现时生成并加入表中
+            key = (samples.dtype, samples.ndim, samples.shape[1] if samples.ndim == 2 else 1)
+            fast_path = self._fast_paths.get(key)
+            if fast_path is None:
+                fast_path = self._fast_paths[key] = self._build_fast_path(*key)
+
+            # 2. 选择输出缓冲区：优先使用复用 Sound 的采样视图，
+            # 未缓存的帧长度才新分配数组；两者都按构造保证 C-contiguous
+            # - 单声道 mixer: 1D 数组 (n,)
+            # - 立体声 mixer: 2D 数组 (n, 2)
+            frames = samples.shape[0]
+            slot = self._next_slot(frames)
+            if slot is not None:
+                sound, audio_data = slot
             else:
-                samples_int16 = samples
-
-            # 2. 确保数组是 C-contiguous（pygame.sndarray 要求）
-            if not samples_int16.flags['C_CONTIGUOUS']:
-                samples_int16 = np.ascontiguousarray(samples_int16)
-
-            # 3. 处理声道转换
-            # 注意: pygame.sndarray.make_sound 对单声道的要求:
-            # - 单声道 mixer: 需要 1D 数组 (n,)，不能是 (n, 1)
-            # - 立体声 mixer: 需要 2D 数组 (n, 2)
-            if samples_int16.ndim == 1:
-                mono = samples_int16
-                if self.channels == 1:
-                    audio_data = mono
-                else:
-                    audio_data = np.repeat(mono[:, None], self.channels, axis=1)
-            else:
-                data = samples_int16
-                if self.channels == 1:
-                    audio_data = data[:, 0]
-                else:
-                    take = min(data.shape[1], self.channels)
-                    audio_data = data[:, :take]
-                    if take < self.channels:
-                        pad = np.repeat(audio_data[:, :1], self.channels - take, axis=1)
-                        audio_data = np.concatenate([audio_data, pad], axis=1)
-
-            # 4. 确保是 C-contiguous
-            if not audio_data.flags['C_CONTIGUOUS']:
-                audio_data = np.ascontiguousarray(audio_data)
-
-            # 5. 创建 Sound 对象并播放
-            # pygame.sndarray.make_sound 需要:
-            # - 单声道: (n,) 1D 数组
-            # - 立体声: (n, 2) 2D 数组
-            sound = pygame.sndarray.make_sound(audio_data)
-
-            # 6. 优化的队列管理（保证连续性和低延迟）
-            # - 如果通道空闲，直接播放
-            # - 如果通道正在播放，始终排队 (保证音频连续,避免断音)
-            # - pygame.mixer 会自动管理队列,最多只能排队1个 Sound 对象
-            if not self._channel.get_busy():
+                sound = None
+                shape = (frames,) if self.channels == 1 else (frames, self.channels)
+                needed = frames * self.channels
+                if needed > self._scratch.size:
+                    self._scratch = aligned_empty(needed * 2, np.int16)
+                audio_data = self._scratch[:needed].reshape(shape)
+
+            # 3. 声道转换，结果直接写入输出缓冲区
+            fast_path(samples, audio_data)
+
+            # 4. 未缓存的帧长度：数据已是 int16 PCM，以 buffer 方式创建 Sound，
+            # 跳过 pygame.sndarray.make_sound 的数组接口转换
+            if sound is None:
+                sound = pygame.mixer.Sound(buffer=audio_data)
+
+            # 5. 提交到通道：首帧 play() 启动播放，此后始终 queue()
+            # - queue() 在通道空闲时会直接开始播放，稳态下无需逐帧 get_busy() 判断
+            # - pygame.mixer 最多只能排队 1 个 Sound 对象
+            # - 少数 SDL_mixer 版本在空闲通道上会丢弃 queue()，
+            #   因此每 PRIME_CHECK_INTERVAL 帧检查一次，发现欠载时重新 play()
+            if not self._primed:
                 self._channel.play(sound)
+                self._primed = True
             else:
                 self._channel.queue(sound)
-
-        except Exception as e:
-            # 只在第一次错误时打印
-            if not hasattr(self, '_error_printed'):
-                print(f"Error playing audio: {e}")
-                import traceback
-                traceback.print_exc()
+                self._submit_count += 1
+                if self._submit_count % PRIME_CHECK_INTERVAL == 0 and not self._channel.get_busy():
+                    self._channel.play(sound)
+
+        except Exception:
+            # 只在第一次错误时记录
+            if not self._error_printed:
+                logger.error("Error playing audio", exc_info=True)
                 self._error_printed = True
 
+    def _build_fast_path(self, dtype, ndim: int, in_channels: int):
+        """
+        生成针对输入格式特化的声道转换函数
+
+        返回的函数签名为 fn(samples, dst)：将转换后的 int16 数据写入预先分配、
+        形状与 mixer 声道数匹配的 dst，每种情况只有一条写入路径。
+
+        Args:
+            dtype: 输入采样的数据类型
+            ndim: 输入数组维数
+            in_channels: 输入声道数（1D 输入视为单声道）
+        """
+        out_channels = self.channels
+
+        if dtype == np.int16:
+            def to_int16(samples):
+                return samples
+        elif dtype.kind == 'f':
+            # 浮点输入范围为 [-1.0, 1.0]，需要缩放并饱和后再转换，不能直接截断
+            to_int16 = float_to_int16
+        else:
+            def to_int16(samples):
+                return np.asarray(samples, dtype=np.int16)
+
+        if ndim == 1 and out_channels == 1 and dtype.kind == 'f':
+            def fast_path(samples, dst):
+                # 缩放结果直接写入输出缓冲区，只遍历一次
+                float_to_int16(samples, dst)
+        elif ndim == 1 and out_channels == 1:
+            def fast_path(samples, dst):
+                dst[:] = to_int16(samples)
+        elif ndim == 1:
+            def fast_path(samples, dst):
+                # 单声道一次遍历展开到所有声道。SDL 只接受交错的连续 PCM，
+                # 无法直接使用步长为 0 的广播视图，这次写入在立体声 mixer 上不可省略；
+                # 单声道游戏以 channels=1 初始化 mixer 即可完全跳过展开
+                expand_mono(to_int16(samples), dst)
+        elif out_channels == 1:
+            def fast_path(samples, dst):
+                dst[:] = to_int16(samples)[:, 0]
+        elif in_channels >= out_channels:
+            def fast_path(samples, dst):
+                dst[:] = to_int16(samples)[:, :out_channels]
+        else:
+            def fast_path(samples, dst):
+                # 先写入已有声道，其余声道由第一列广播填充，不分配中间数组
+                data = to_int16(samples)
+                dst[:, :in_channels] = data
+                dst[:, in_channels:] = data[:, :1]
+
+        return fast_path
+
+    def _next_slot(self, frames: int):
+        """
+        获取可写入 frames 帧音频的下一个复用 Sound
+
+        Sound 的采样内存通过 pygame.sndarray.samples 直接引用，写入即生效。
+        会跳过通道中正在播放或排队的 Sound，避免覆盖未播完的数据。
+
+        Args:
+            frames: 帧数
+
+        Returns:
+            (sound, 采样视图)；该长度无法复用时返回 None
+        """
+        ring = self._sound_rings.get(frames)
+        if ring is None:
+            if len(self._sound_rings) >= MAX_RING_LENGTHS:
+                return None
+            # 直接用静音字节创建 Sound，不经过 numpy → sndarray 转换
+            silence = bytes(frames * self.channels * 2)
+            sounds = [pygame.mixer.Sound(buffer=silence) for _ in range(SOUND_RING_SIZE)]
+            views = [pygame.sndarray.samples(sound) for sound in sounds]
+            ring = self._sound_rings[frames] = [sounds, views, 0]
+
+        sounds, views, idx = ring
+        busy = (self._channel.get_sound(), self._channel.get_queue())
+        for _ in range(SOUND_RING_SIZE):
+            if sounds[idx] not in busy:
+                break
+            idx = (idx + 1) % SOUND_RING_SIZE
+        ring[2] = (idx + 1) % SOUND_RING_SIZE
+        return sounds[idx], views[idx]
+
     def close(self) -> None:
         """关闭音频驱动"""
         self._initialized = False
 
+        # 唤醒并等待 feeder 线程退出，之后才能释放 Sound 环和通道
+        self._pending_event.set()
+        if self._feeder_thread is not None:
+            self._feeder_thread.join(timeout=1.0)
+            self._feeder_thread = None
+        self._pending.clear()
+
+        self._sound_rings.clear()
+        self._scratch = aligned_empty(0, np.int16)
+        self._fast_paths = {}
+        self._primed = False
+        self._submit_count = 0
+
         if self._channel:
             try:
                 self._channel.stop()
@@ -189,7 +413,7 @@ class PygameMixerDriverLowLatency(PygameMixerDriver):
     """
     低延迟 Pygame Mixer 音频驱动
 
-    使用更小的缓冲区以降低延迟
+    按 LOW_LATENCY_MS 目标延迟选取更小的 2 的幂缓冲区
     适合对音频同步要求高的场景
 
     注意：
@@ -198,5 +422,5 @@ class PygameMixerDriverLowLatency(PygameMixerDriver):
     """
 
     def __init__(self, **kwargs):
-        kwargs['buffer_size'] = kwargs.get('buffer_size', 512)  # 更小的缓冲区
+        kwargs.setdefault('latency_ms', LOW_LATENCY_MS)  # 显式传入 buffer_size 时仍以其为准
         super().__init__(**kwargs)
@@ -18,6 +18,7 @@ setup(
         "luma": ["luma.oled", "luma.core"],
         "audio": ["pyaudio"],
         "evdev": ["evdev"],
+        "numba": ["numba"],
     },
     python_requires=">=3.7",
     classifiers=[